@@ -0,0 +1,81 @@
+# ============================================================================
+# Memory benchmark: list of device dicts vs apapi.DeviceStore
+#
+# Usage:
+#   python benchmarks/bench_device_store.py [--devices 100000] [--page-size 999]
+#
+# Builds synthetic /devices pages, decodes them with json.loads as the Graph
+# client does, and compares the traced memory of keeping every device dict
+# against folding each page into a DeviceStore.
+# ============================================================================
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from apapi import DeviceStore
+
+OS_VERSIONS = [f"10.0.{build}.{rev}" for build in (19045, 22621, 22631, 26100) for rev in range(4000, 4600, 50)]
+MANAGEMENT_TYPES = ['MDM', 'EAS', None]
+
+def synthetic_pages(total, page_size):
+    rng = random.Random(42)
+    for start in range(0, total, page_size):
+        page = [{
+            'displayName': f"DESKTOP-{i:07d}",
+            'deviceId': str(uuid.UUID(int=rng.getrandbits(128))),
+            'managementType': rng.choice(MANAGEMENT_TYPES),
+            'operatingSystemVersion': rng.choice(OS_VERSIONS),
+        } for i in range(start, min(start + page_size, total))]
+        yield json.dumps({'value': page})
+
+def measure(pages, build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(pages)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+def build_dicts(pages):
+    devices = []
+    for body in pages:
+        devices.extend(json.loads(body)['value'])
+    return devices
+
+def build_store(pages):
+    store = DeviceStore()
+    for body in pages:
+        store.extend(json.loads(body)['value'])
+    return store
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare device dict and DeviceStore memory use")
+    parser.add_argument('--devices', type=int, default=100000)
+    parser.add_argument('--page-size', type=int, default=999)
+    args = parser.parse_args()
+    pages = list(synthetic_pages(args.devices, args.page_size))
+    devices, dict_mem, dict_peak, dict_time = measure(pages, build_dicts)
+    store, store_mem, store_peak, store_time = measure(pages, build_store)
+    assert len(devices) == len(store)
+    print(f"Devices: {len(store)}")
+    print(f"{'Representation':15} | {'Retained MB':12} | {'Peak MB':10} | {'Build s':8}")
+    print("-"*54)
+    print(f"{'list of dicts':15} | {dict_mem / 2**20:12.1f} | {dict_peak / 2**20:10.1f} | {dict_time:8.2f}")
+    print(f"{'DeviceStore':15} | {store_mem / 2**20:12.1f} | {store_peak / 2**20:10.1f} | {store_time:8.2f}")
+    print(f"Retained memory reduction: {100 * (1 - store_mem / dict_mem):.0f}%")
+    start = time.perf_counter()
+    per_os = store.count_by('operatingSystemVersion')
+    mdm = store.filter(managementType='MDM', operatingSystemVersion=OS_VERSIONS[0])
+    print(f"count_by + filter over {len(store)} devices: {time.perf_counter() - start:.3f}s "
+          f"({len(per_os)} OS versions, {len(mdm)} MDM devices on {OS_VERSIONS[0]})")
+
+if __name__ == "__main__":
+    main()
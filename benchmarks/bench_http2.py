@@ -0,0 +1,144 @@
+# ============================================================================
+# Fan-out benchmark: HTTP/1.1 (requests) vs HTTP/2 (apapi.Http2Session)
+#
+# Usage:
+#   python benchmarks/bench_http2.py [--requests 300] [--concurrency 32] [--delay-ms 40]
+#
+# Starts two local stubs that answer every GET after a fixed delay, emulating
+# Graph latency for /configurationPolicies/{id}/settings style sub-resources:
+# a threaded HTTP/1.1 server and a cleartext (prior-knowledge) HTTP/2 server
+# built on the h2 package. The same fan-out is then issued through a pooled
+# requests.Session and through Http2Session, reporting wall time and the
+# number of TCP connections each stub accepted.
+#
+# Needs: pip install 'httpx[http2]' requests
+# ============================================================================
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import h2.config
+import h2.connection
+import h2.events
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from apapi import Http2Session
+
+def response_body(path):
+    return json.dumps({'value': [{'id': path, 'settingInstance': {'settingDefinitionId': 'x'}}]}).encode()
+
+def start_http1_stub(delay):
+    connections = [0]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            connections[0] += 1
+            super().setup()
+
+        def do_GET(self):
+            time.sleep(delay)
+            body = response_body(self.path)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1], connections
+
+def start_http2_stub(delay):
+    connections = [0]
+    ready = threading.Event()
+    port = []
+
+    async def handle(reader, writer):
+        connections[0] += 1
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+
+        async def respond(stream_id, path):
+            await asyncio.sleep(delay)
+            body = response_body(path)
+            conn.send_headers(stream_id, [(':status', '200'), ('content-type', 'application/json'),
+                                          ('content-length', str(len(body)))])
+            conn.send_data(stream_id, body, end_stream=True)
+            writer.write(conn.data_to_send())
+
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    path = dict((k.decode() if isinstance(k, bytes) else k, v) for k, v in event.headers)[':path']
+                    asyncio.ensure_future(respond(event.stream_id, path if isinstance(path, str) else path.decode()))
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    writer.close()
+                    return
+            writer.write(conn.data_to_send())
+        writer.close()
+
+    def run():
+        loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(asyncio.start_server(handle, '127.0.0.1', 0))
+        port.append(server.sockets[0].getsockname()[1])
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return port[0], connections
+
+def fan_out(session, base_url, count, concurrency):
+    def fetch(i):
+        response = session.get(f"{base_url}/configurationPolicies/{i}/settings", headers={'Accept': 'application/json'})
+        response.raise_for_status()
+        return len(response.json()['value'])
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, range(count)))
+    assert sum(results) == count
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HTTP/1.1 and HTTP/2 fan-out latency against local stubs")
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--delay-ms', type=float, default=40.0, help="Server-side latency per request")
+    args = parser.parse_args()
+    delay = args.delay_ms / 1000
+    http1_port, http1_connections = start_http1_stub(delay)
+    http2_port, http2_connections = start_http2_stub(delay)
+
+    # One pooled keep-alive connection per worker: the best case for HTTP/1.1 at this concurrency
+    session = requests.Session()
+    session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=args.concurrency))
+    http1_time = fan_out(session, f"http://127.0.0.1:{http1_port}", args.requests, args.concurrency)
+    # Cleartext HTTP/2 needs prior knowledge, hence http1=False; against Graph TLS ALPN negotiates h2
+    http2_time = fan_out(Http2Session(http1=False), f"http://127.0.0.1:{http2_port}", args.requests, args.concurrency)
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {args.delay_ms:.0f} ms server latency")
+    print(f"{'Transport':10} | {'Wall s':8} | {'Req/s':8} | {'Connections':11}")
+    print("-"*46)
+    print(f"{'HTTP/1.1':10} | {http1_time:8.2f} | {args.requests / http1_time:8.0f} | {http1_connections[0]:11}")
+    print(f"{'HTTP/2':10} | {http2_time:8.2f} | {args.requests / http2_time:8.0f} | {http2_connections[0]:11}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# ============================================================================
+# Streaming decode benchmark: response.json() vs apapi.stream_page_items
+#
+# Usage:
+#   python benchmarks/bench_streaming.py [--items 50000] [--kind devices|catalog]
+#                                        [--chunk-delay-ms 0]
+#
+# Builds one large synthetic Graph page and feeds it in 64 KiB chunks, the way
+# requests hands a streamed body over. The buffered path joins the chunks and
+# calls json.loads before rendering anything; the streaming path hands each
+# value[] item to the consumer as soon as it is decoded. Reports
+# time-to-first-item, total time and peak traced memory for both.
+# ============================================================================
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from apapi import STREAM_CHUNK_SIZE, stream_page_items
+
+def synthetic_body(kind, count):
+    rng = random.Random(7)
+    if kind == 'devices':
+        items = [{
+            'displayName': f"DESKTOP-{i:07d}",
+            'deviceId': str(uuid.UUID(int=rng.getrandbits(128))),
+            'managementType': rng.choice(['MDM', 'EAS', None]),
+            'operatingSystemVersion': f"10.0.{rng.choice([19045, 22631, 26100])}.{rng.randint(4000, 5500)}",
+        } for i in range(count)]
+    else:
+        # Catalog entries with expanded productRevisions are few but individually large
+        items = [{
+            '@odata.type': '#microsoft.graph.windowsUpdates.qualityUpdateCatalogEntry',
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'displayName': f"{2025 - i // 12}.{i % 12 + 1:02d} B SecurityUpdate",
+            'releaseDateTime': '2025-06-10T00:00:00Z',
+            'productRevisions': [{
+                'id': f"10.0.{build}.{rev}",
+                'displayName': f"Windows 11, version 23H2 build {build}.{rev}",
+                'osBuild': {'majorVersion': 10, 'minorVersion': 0, 'buildNumber': build, 'updateBuildRevision': rev},
+                'knowledgeBaseArticle': {'id': f"KB{5000000 + rev}", 'url': 'https://support.microsoft.com/help/'},
+            } for build in (19045, 22621, 22631, 26100) for rev in range(4000, 4000 + count // 4)],
+        } for i in range(12)]
+    return json.dumps({
+        '@odata.context': 'https://graph.microsoft.com/v1.0/$metadata#devices',
+        'value': items,
+        '@odata.nextLink': None,
+    }).encode()
+
+def chunked(body, delay):
+    for i in range(0, len(body), STREAM_CHUNK_SIZE):
+        if delay:
+            time.sleep(delay)
+        yield body[i:i + STREAM_CHUNK_SIZE]
+
+def run(label, body, delay, decode):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for item in decode(chunked(body, delay)):
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:10} | {count:8} | {first * 1000:14.1f} | {total:8.2f} | {peak / 2**20:8.1f}")
+
+def buffered(chunks):
+    return json.loads(b''.join(chunks))['value']
+
+def streamed(chunks):
+    return stream_page_items(chunks, {})
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare buffered and streaming Graph page decoding")
+    parser.add_argument('--items', type=int, default=50000)
+    parser.add_argument('--kind', choices=['devices', 'catalog'], default='devices')
+    parser.add_argument('--chunk-delay-ms', type=float, default=0.0, help="Simulated network delay per chunk")
+    args = parser.parse_args()
+    body = synthetic_body(args.kind, args.items)
+    delay = args.chunk_delay_ms / 1000
+    print(f"Page size: {len(body) / 2**20:.1f} MB ({args.kind})")
+    print(f"{'Decoder':10} | {'Items':8} | {'First item ms':14} | {'Total s':8} | {'Peak MB':8}")
+    print("-"*60)
+    run('buffered', body, delay, buffered)
+    run('streaming', body, delay, streamed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import gzip
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import apapi
+
+def event(event_id, when, resource_id):
+    return {'id': event_id, 'activityDateTime': when, 'activity': f"change {event_id}",
+            'resources': [{'resourceId': resource_id, 'type': 'WindowsQualityUpdatePolicy'}]}
+
+@pytest.fixture
+def log(tmp_path):
+    return apapi.AuditLog(str(tmp_path))
+
+def commit(log, events, state=None):
+    state = log.load_state() if state is None else state
+    log.recover(state)
+    log.append(events, state)
+    log.save_state(state)
+    return state
+
+def test_history_reads_indexed_events(log):
+    commit(log, [event('1', '2026-10-17T01:00:00Z', 'R1'), event('2', '2026-10-18T01:00:00Z', 'R2')])
+    commit(log, [event('3', '2026-10-18T02:00:00Z', 'R1')])
+    assert [e['id'] for e in log.history('R1')] == ['1', '3']
+    assert [e['id'] for e in log.history('R2')] == ['2']
+    assert log.history('R3') == []
+
+def test_interrupted_append_is_truncated_to_committed_size(log):
+    commit(log, [event('1', '2026-10-18T01:00:00Z', 'R1')])
+    path = log.partition_path('2026-10-18')
+    committed = os.path.getsize(path)
+    # An append whose state was never saved, followed by a half-written member
+    log.append([event('2', '2026-10-18T02:00:00Z', 'R1')], log.load_state())
+    with open(path, 'ab') as f:
+        f.write(b'\x1f\x8b\x08\x00partial')
+    state = log.load_state()
+    log.recover(state)
+    assert os.path.getsize(path) == committed
+    with gzip.open(path, 'rt') as f:
+        assert len(f.readlines()) == 1
+    assert [e['id'] for e in log.history('R1')] == ['1']
+
+def test_uncommitted_partition_is_removed(log):
+    commit(log, [event('1', '2026-10-17T01:00:00Z', 'R1')])
+    log.append([event('2', '2026-10-18T01:00:00Z', 'R1')], log.load_state())
+    log.recover(log.load_state())
+    assert log.partitions() == ['2026-10-17']
+
+def test_missing_state_is_rebuilt_without_deleting_partitions(log):
+    state = commit(log, [event('1', '2026-10-17T01:00:00Z', 'R1'), event('2', '2026-10-18T01:00:00Z', 'R2'),
+                         event('3', '2026-10-18T01:00:00Z', 'R1')])
+    state.update(watermark='2026-10-18T01:00:00Z', idsAtWatermark=['2', '3'])
+    log.save_state(state)
+    os.remove(log.state_file)
+    rebuilt = log.load_state()
+    log.recover(rebuilt)
+    assert rebuilt == state
+    assert log.partitions() == ['2026-10-17', '2026-10-18']
+    assert [e['id'] for e in log.history('R1')] == ['1', '3']
+
+def test_unreadable_partition_without_state_is_kept(log):
+    commit(log, [event('1', '2026-10-18T01:00:00Z', 'R1')])
+    path = log.partition_path('2026-10-18')
+    with open(path, 'ab') as f:
+        f.write(b'\x1f\x8b\x08\x00partial')
+    os.remove(log.state_file)
+    with pytest.raises(SystemExit):
+        log.load_state()
+    assert os.path.exists(path)
+
+def test_ingest_skips_events_already_seen_at_the_watermark(log, monkeypatch):
+    events = [event('1', '2026-10-18T01:00:00Z', 'R1'), event('2', '2026-10-18T02:00:00Z', 'R1')]
+    queries = []
+    def fake_iter_items(url, headers):
+        # Ignores the $filter: events older than the watermark must be dropped locally as well
+        queries.append(url)
+        return [dict(e) for e in events]
+    monkeypatch.setattr(apapi, 'iter_items', fake_iter_items)
+    apapi.ingest_audit_events('token', directory=log.directory)
+    apapi.ingest_audit_events('token', directory=log.directory)
+    assert 'activityDateTime ge 2026-10-18T02:00:00Z' in queries[-1]
+    assert [e['id'] for e in log.history('R1')] == ['1', '2']
+    # A late event sharing the watermark timestamp is new; the ones already stored are not
+    events.append(event('3', '2026-10-18T02:00:00Z', 'R1'))
+    apapi.ingest_audit_events('token', directory=log.directory)
+    assert [e['id'] for e in log.history('R1')] == ['1', '2', '3']
+    assert log.load_state()['idsAtWatermark'] == ['2', '3']
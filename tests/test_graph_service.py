@@ -0,0 +1,94 @@
+import http.client
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import apapi
+
+class FakeResponse:
+    status_code = 201
+    text = ''
+
+class FakePipeline:
+    def __init__(self):
+        self.groups = []
+        self.assignments = []
+
+    def ensure_group(self, headers, group_name):
+        self.groups.append(group_name)
+        return 'group-1'
+
+    def ensure_assignment(self, headers, assignments_url, group_id, payload):
+        self.assignments.append((assignments_url, group_id, payload))
+        return FakeResponse()
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    pipeline = FakePipeline()
+    monkeypatch.setattr(apapi, 'WRITE_PIPELINE', pipeline)
+    monkeypatch.setattr(apapi.TOKEN_PROVIDER, 'headers', lambda: {})
+    return pipeline
+
+@pytest.mark.parametrize('kind', ['hotpatch-policies', 'expedite-profiles'])
+def test_deploy_by_group_name_creates_or_finds_group(pipeline, kind):
+    status, result = apapi.GraphService(60).dispatch('POST', f'/{kind}/x/assignments', {'groupName': 'Ring 1'})
+    assert (status, result) == (201, {'groupId': 'group-1', 'status': 'assigned'})
+    assert pipeline.groups == ['Ring 1']
+    (_, group_id, payload), = pipeline.assignments
+    assert group_id == 'group-1'
+    assert 'group-1' in repr(payload) and 'None' not in repr(payload)
+
+def test_deploy_by_group_id_skips_group_lookup(pipeline):
+    status, _ = apapi.GraphService(60).dispatch('POST', '/hotpatch-policies/x/assignments', {'groupId': 'g'})
+    assert status == 201
+    assert pipeline.groups == []
+    assert pipeline.assignments[0][1] == 'g'
+
+@pytest.mark.parametrize('body', [{}, {'groupName': 5}, {'groupId': 5}])
+def test_deploy_rejects_bad_group(pipeline, body):
+    status, _ = apapi.GraphService(60).dispatch('POST', '/hotpatch-policies/x/assignments', body)
+    assert status == 400
+    assert pipeline.assignments == []
+
+class EchoService:
+    def dispatch(self, method, path, body):
+        return 200, {'method': method, 'body': body}
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(apapi.ServiceRequestHandler, 'service', EchoService())
+    monkeypatch.setattr(apapi.ServiceRequestHandler, 'api_key', 'secret')
+    monkeypatch.setattr(apapi.ServiceRequestHandler, 'log_message', lambda *args: None)
+    server = apapi.PooledHTTPServer(('127.0.0.1', 0), apapi.ServiceRequestHandler, 2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+def request(port, method, body=None, **headers):
+    headers = {'Host': f'127.0.0.1:{port}', apapi.SERVICE_KEY_HEADER: 'secret',
+               'Content-Type': 'application/json', **headers}
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    connection.request(method, '/x', body=body, headers={k: v for k, v in headers.items() if v is not None})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+def test_service_accepts_local_json_request_with_key(server):
+    assert request(server, 'POST', b'{"a": 1}') == (200, {'method': 'POST', 'body': {'a': 1}})
+    assert request(server, 'GET', Host=f'localhost:{server}', **{'Content-Type': None})[0] == 200
+
+@pytest.mark.parametrize('method, body, headers, status', [
+    ('GET', None, {'Host': 'attacker.example:8765'}, 403),
+    ('GET', None, {apapi.SERVICE_KEY_HEADER: None}, 401),
+    ('GET', None, {apapi.SERVICE_KEY_HEADER: 'wrong'}, 401),
+    ('POST', b'{"groupName": "x"}', {'Content-Type': 'text/plain'}, 415),
+    ('PATCH', b'{}', {'Content-Type': None}, 415),
+    ('POST', b'[1]', {}, 400),
+])
+def test_service_rejects_foreign_requests(server, method, body, headers, status):
+    assert request(server, method, body, **headers)[0] == status
@@ -0,0 +1,53 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import apapi
+
+def test_hit_within_ttl_and_miss_after_clear():
+    cache = apapi.ResponseCache(60)
+    assert cache.get_or_fetch('k', lambda: 'v1') == 'v1'
+    assert cache.get_or_fetch('k', lambda: 'v2') == 'v1'
+    cache.clear()
+    assert cache.get_or_fetch('k', lambda: 'v3') == 'v3'
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def test_expired_entry_is_fetched_again():
+    cache = apapi.ResponseCache(0)
+    cache.get_or_fetch('k', lambda: 'old')
+    assert cache.get_or_fetch('k', lambda: 'new') == 'new'
+
+def test_fetch_overlapping_clear_is_not_cached():
+    cache = apapi.ResponseCache(60)
+    started, release = threading.Event(), threading.Event()
+    def slow_fetch():
+        started.set()
+        release.wait(5)
+        return 'before write'
+    results = []
+    reader = threading.Thread(target=lambda: results.append(cache.get_or_fetch('k', slow_fetch)))
+    reader.start()
+    assert started.wait(5)
+    cache.clear()
+    # A read after the write must not join the in-flight pre-write fetch
+    assert cache.get_or_fetch('k', lambda: 'after write') == 'after write'
+    release.set()
+    reader.join()
+    assert results == ['before write']
+    assert cache.get_or_fetch('k', lambda: 'refetched') == 'after write'
+
+def test_fetch_started_before_clear_does_not_overwrite_newer_entry():
+    cache = apapi.ResponseCache(60)
+    started, release = threading.Event(), threading.Event()
+    def slow_fetch():
+        started.set()
+        release.wait(5)
+        return 'stale'
+    reader = threading.Thread(target=lambda: cache.get_or_fetch('k', slow_fetch))
+    reader.start()
+    assert started.wait(5)
+    cache.clear()
+    release.set()
+    reader.join()
+    assert cache.get_or_fetch('k', lambda: 'fresh') == 'fresh'
@@ -0,0 +1,106 @@
+import os
+import random
+import sys
+from collections import Counter
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import apapi
+
+CONFIG = dict(apapi.ROLLOUT_DEFAULTS, updateSizeMB=dict(apapi.ROLLOUT_DEFAULTS['updateSizeMB']))
+
+def offers_per_day(plan):
+    load = Counter()
+    for group in plan['groups']:
+        day, left = group['startOffsetDays'], group['devices']
+        while left > 0:
+            load[day] += min(group['devicesPerOffer'], left)
+            left -= group['devicesPerOffer']
+            day += group['offerIntervalDays']
+    return load
+
+def random_groups(seed):
+    rng = random.Random(seed)
+    return {f"g{i}": rng.choice([0, 1, 2, 5, 50, 500, 5000]) for i in range(rng.randint(1, 3000))}
+
+@pytest.mark.parametrize('group_counts', [
+    {'a': 20000, 'b': 5000},
+    {'a': 3, 'b': 100000, 'c': 0},
+    {f"g{i}": 1 for i in range(20000)},
+    {**{f"g{i}": 1 for i in range(1500)}, 'big': 3000},
+] + [random_groups(seed) for seed in range(8)])
+def test_offers_never_exceed_daily_capacity(group_counts):
+    plan = apapi.plan_rollout(group_counts, 'feature', CONFIG)
+    load = offers_per_day(plan)
+    assert max(load.values(), default=0) <= plan['dailyCapacity']
+    assert sum(load.values()) == plan['totalDevices']
+    assert plan['durationDays'] == max(load, default=-1) + 1
+    assert all(g['devicesPerOffer'] >= 1 for g in plan['groups'])
+
+def test_small_groups_do_not_slow_down_large_ones():
+    plan = apapi.plan_rollout({**{f"g{i}": 1 for i in range(1500)}, 'big': 3000}, 'feature', CONFIG)
+    big = next(g for g in plan['groups'] if g['groupId'] == 'big')
+    assert big['offerIntervalDays'] == 1
+    assert plan['durationDays'] <= 2 * 4500 / plan['dailyCapacity'] + 1
+
+def test_payload_carries_interval_and_staggered_start():
+    plan = apapi.plan_rollout({f"g{i}": 1 for i in range(2000)}, 'feature', CONFIG)
+    payloads = apapi.rollout_payloads(plan, 'update')
+    schedules = [p['settings']['schedule'] for p in payloads[:2]]
+    assert schedules[0]['gradualRollout']['durationBetweenOffers'] == 'P2D'
+    assert schedules[0]['startDateTime'] == plan['startDateTime']
+    assert schedules[1]['startDateTime'] > schedules[0]['startDateTime']
+
+class FakeResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(str(self.status_code), response=self)
+
+class FakeHTTP:
+    def __init__(self, answers):
+        self.answers = answers
+
+    def get(self, url, headers=None):
+        answer = self.answers[url.split('/groups/')[1].split('/')[0]]
+        if isinstance(answer, Exception):
+            raise answer
+        return FakeResponse(*answer)
+
+def test_device_counts_fall_back_to_assumed_size(monkeypatch, capsys):
+    monkeypatch.setattr(apapi, 'HTTP', FakeHTTP({
+        'ok': (200, '42'),
+        'empty': (200, '0'),
+        'forbidden': (403, 'Forbidden'),
+        'offline': requests.exceptions.ConnectionError('down'),
+    }))
+    counts = apapi.fetch_group_device_counts({}, ['ok', 'empty', 'forbidden', 'offline'], CONFIG)
+    assumed = CONFIG['assumedGroupDevices']
+    assert counts == {'ok': 42, 'empty': assumed, 'forbidden': assumed, 'offline': assumed}
+    out = capsys.readouterr().out
+    assert 'Group empty has no devices yet' in out
+    assert 'Could not count devices in group forbidden' in out
+
+def test_simulation_reports_unfinished_rollout(monkeypatch, capsys):
+    slow = dict(CONFIG, bandwidthMbps=5)
+    plan = apapi.plan_rollout({'g': 5000}, 'feature', CONFIG)
+    history, unfinished = apapi.simulate_rollout(plan, slow)
+    assert unfinished > 0
+    assert len(history) == 10 * plan['durationDays'] + 31
+    monkeypatch.setattr(apapi, 'load_rollout_config', lambda: dict(CONFIG))
+    monkeypatch.setattr(apapi, 'simulate_rollout', lambda p, c, seed=0: (history, unfinished))
+    apapi.run_rollout_simulation('feature', [5000])
+    out = capsys.readouterr().out
+    assert 'Completed' not in out
+    assert f"{unfinished} device(s) still to download" in out
+
+def test_simulation_completes_within_capacity():
+    plan = apapi.plan_rollout({'a': 3000, 'b': 40}, 'feature', CONFIG)
+    history, unfinished = apapi.simulate_rollout(plan, CONFIG)
+    assert unfinished == 0
+    assert max(new for _, new, _, _, _ in history) <= plan['dailyCapacity']
@@ -0,0 +1,41 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from apapi import stream_page_items
+
+DOCUMENT = {
+    '@odata.context': 'https://graph.microsoft.com/v1.0/$metadata#devices',
+    'value': [
+        {'id': 'a', 'ratio': 1.5, 'big': 2.5e-3, 'neg': -12, 'flag': True, 'none': None, 'name': 'café €'},
+        {'id': 'b', 'nested': {'list': [1, 2.25, False, [3e10]]}, 'empty': {}},
+        {},
+    ],
+    'count': 12345,
+    'ratio': 0.75,
+    '@odata.nextLink': 'https://graph.microsoft.com/v1.0/devices?$skiptoken=x',
+}
+
+@pytest.mark.parametrize('indent', [None, 2])
+def test_every_split_offset(indent):
+    body = json.dumps(DOCUMENT, indent=indent, ensure_ascii=False).encode()
+    expected_meta = {k: v for k, v in DOCUMENT.items() if k != 'value'}
+    for offset in range(len(body) + 1):
+        meta = {}
+        items = list(stream_page_items([body[:offset], body[offset:]], meta))
+        assert items == DOCUMENT['value'], offset
+        assert meta == expected_meta, offset
+
+def test_single_byte_chunks():
+    body = json.dumps(DOCUMENT).encode()
+    meta = {}
+    assert list(stream_page_items([body[i:i + 1] for i in range(len(body))], meta)) == DOCUMENT['value']
+    assert meta['count'] == 12345
+
+@pytest.mark.parametrize('body', [b'{"value":[1,2', b'[1]', b'{"value":[1}', b'{"a":1} x', b'', b'{"value":[1.]}'])
+def test_malformed_bodies_raise(body):
+    with pytest.raises(ValueError):
+        list(stream_page_items([body], {}))
@@ -0,0 +1,111 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import apapi
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+        self.text = repr(body)
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        pass
+
+class FakeGraph:
+    def __init__(self):
+        self.gets = []
+        self.posts = []
+        self.groups = []
+        self.assigned = []
+        self.post_started = threading.Event()
+        self.release_post = threading.Event()
+        self.release_post.set()
+
+    def get(self, url, headers=None):
+        self.gets.append(url)
+        if '/assignments' in url:
+            return FakeResponse(200, {'value': [{'target': {'groupId': g}} for g in self.assigned]})
+        return FakeResponse(200, {'value': list(self.groups)})
+
+    def post(self, url, headers=None, data=None):
+        self.posts.append((url, data))
+        self.post_started.set()
+        self.release_post.wait(5)
+        if url.endswith('/groups'):
+            return FakeResponse(201, {'id': 'new-group', 'displayName': 'Ring 1'})
+        return FakeResponse(201, {})
+
+@pytest.fixture
+def graph(monkeypatch):
+    graph = FakeGraph()
+    monkeypatch.setattr(apapi, 'HTTP', graph)
+    return graph
+
+@pytest.mark.parametrize('value, literal', [
+    ("ring1", "'ring1'"),
+    ("o'brien", "'o''brien'"),
+    ("''", "''''''"),
+    ("a&b #1", "'a%26b%20%231'"),
+])
+def test_odata_string_escapes_quotes_and_url_specials(value, literal):
+    assert apapi.odata_string(value) == literal
+
+def test_ensure_group_filter_escapes_nickname(graph):
+    apapi.WritePipeline().ensure_group({}, "O'Brien Ring")
+    assert graph.gets[0].endswith("$filter=mailNickname eq 'o''brienring'")
+
+def test_known_group_is_reused_until_it_expires(graph):
+    graph.groups = [{'id': 'g1', 'displayName': 'Ring 1'}]
+    pipeline = apapi.WritePipeline(index_ttl=0.05)
+    assert pipeline.ensure_group({}, 'Ring 1') == 'g1'
+    assert pipeline.ensure_group({}, 'Ring 1') == 'g1'
+    assert len(graph.gets) == 1
+    # Deleted outside this process: after the TTL the lookup misses and the group is re-created
+    graph.groups = []
+    time.sleep(0.06)
+    assert pipeline.ensure_group({}, 'Ring 1') == 'new-group'
+    assert len(graph.gets) == 2 and len(graph.posts) == 1
+
+def test_assignment_index_expires(graph):
+    graph.assigned = ['g1']
+    pipeline = apapi.WritePipeline(index_ttl=0.05)
+    url = 'https://graph.example/policies/p/assignments'
+    assert pipeline.ensure_assignment({}, url, 'g1', {}) is None
+    assert pipeline.ensure_assignment({}, url, 'g1', {}) is None
+    assert len(graph.gets) == 1 and graph.posts == []
+    # Unassigned elsewhere: once the index expires the assignment is sent again
+    graph.assigned = []
+    time.sleep(0.06)
+    assert pipeline.ensure_assignment({}, url, 'g1', {}).status_code == 201
+    assert len(graph.posts) == 1
+
+def test_identical_concurrent_posts_share_one_call(graph):
+    pipeline = apapi.WritePipeline()
+    graph.release_post.clear()
+    results = []
+    first = threading.Thread(target=lambda: results.append(pipeline.post({}, 'https://graph.example/x', {'a': 1})))
+    first.start()
+    assert graph.post_started.wait(5)
+    second = threading.Thread(target=lambda: results.append(pipeline.post({}, 'https://graph.example/x', {'a': 1})))
+    second.start()
+    while pipeline.coalesced == 0:
+        time.sleep(0.001)
+    graph.release_post.set()
+    first.join()
+    second.join()
+    assert len(graph.posts) == 1
+    assert results[0] is results[1]
+    assert (pipeline.calls_made, pipeline.calls_saved) == (1, 1)
+
+def test_ring_prefix_filter_is_escaped(graph):
+    apapi.fetch_ring_membership({}, "Bob's Ring")
+    assert graph.gets[0].endswith("$filter=startswith(displayName,'Bob''s%20Ring')")